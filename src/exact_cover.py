@@ -0,0 +1,53 @@
+from typing import Dict, Iterator, List, Optional, Set, Tuple
+
+"""
+    Knuth's Algorithm X, with columns kept as dicts of sets instead of dancing links.
+"""
+
+
+def solve_exact_cover(X: Dict[int, Set[int]], Y: Dict[int, Tuple[int, ...]], solution: Optional[List[int]] = None) -> Iterator[List[int]]:
+    """
+        Yield every set of rows of Y covering each column of X exactly once.
+        X maps each column to the rows covering it, Y maps each row to the columns it covers.
+    """
+    if solution is None:
+        solution = []
+    if not X:
+        yield list(solution)
+        return
+    # Branch on the column with the fewest rows, stop looking once one has a single row or none
+    c = next(iter(X))
+    fewest = len(X[c])
+    for column, rows in X.items():
+        if len(rows) < fewest:
+            c, fewest = column, len(rows)
+            if fewest <= 1:
+                break
+    if fewest == 0:
+        return
+    for r in list(X[c]):
+        solution.append(r)
+        columns = select(X, Y, r)
+        yield from solve_exact_cover(X, Y, solution)
+        deselect(X, Y, r, columns)
+        solution.pop()
+
+
+def select(X: Dict[int, Set[int]], Y: Dict[int, Tuple[int, ...]], r: int) -> List[Set[int]]:
+    columns = []
+    for j in Y[r]:
+        for i in X[j]:
+            for k in Y[i]:
+                if k != j:
+                    X[k].remove(i)
+        columns.append(X.pop(j))
+    return columns
+
+
+def deselect(X: Dict[int, Set[int]], Y: Dict[int, Tuple[int, ...]], r: int, columns: List[Set[int]]):
+    for j in reversed(Y[r]):
+        X[j] = columns.pop()
+        for i in X[j]:
+            for k in Y[i]:
+                if k != j:
+                    X[k].add(i)
@@ -1,20 +1,49 @@
 from __future__ import annotations
 
+import os
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+from functools import reduce
 from itertools import combinations, product
+from operator import or_
 from timeit import default_timer as timer
-from typing import Dict, Iterable, List, Set
+from typing import Dict, Iterable, List, Optional, Set, Tuple
 
+from src.exact_cover import solve_exact_cover
 from src.exceptions import InvalidCellValue, InvalidSudoku
 from src.util import *
 
+# Empty cells are displayed as underscores
+BLANK_ZEROS = str.maketrans("0", "_")
+# Candidates of a cell as displayed, for every 9-bit candidate mask
+DIGIT_STRINGS = tuple("".join(str(d) for d in iter_digits(mask)).center(10) for mask in range(ALL_DIGITS + 1))
+
 
 class Sudoku:
-    def __init__(self, cells: List[int] = None, name: str = "Sudoku"):
+    __slots__ = (
+        "cells", "candidates", "candidate_cells", "dirty_cells", "pending_cells", "revision", "idle_techniques",
+        "row_used", "column_used", "box_used", "name", "verbose",
+    )
+
+    cells: bytearray
+    candidates: array
+    candidate_cells: List[int]
+    dirty_cells: int
+    pending_cells: Dict[str, int]
+    revision: int
+    idle_techniques: Dict[str, int]
+    row_used: array
+    column_used: array
+    box_used: array
+    name: str
+    verbose: bool
+
+    def __init__(self, cells: Optional[List[int]] = None, name: str = "Sudoku", verbose: bool = False):
         if cells is None:
             cells = [0] * 81
         self.set_cells(cells)
-        self.candidates = [set() for _ in range(81)]
         self.name = name
+        self.verbose = verbose
 
     def get_cell(self, r: int, c: int) -> int:
         return self.cells[cell_index(r, c)]
@@ -27,120 +56,244 @@ class Sudoku:
             if not valid_cell_value(cell):
                 raise InvalidCellValue()
 
-        self.cells = cells
+        # One byte per cell, copied so that the caller's list is left untouched
+        self.cells = bytearray(cells)
+        # Digits placed in each row, column and box, as 9-bit masks
+        self.row_used = array('H', [0] * 9)
+        self.column_used = array('H', [0] * 9)
+        self.box_used = array('H', [0] * 9)
+        for i, value in enumerate(cells):
+            if value != 0:
+                self.mark_used(i, value)
+
+        # Candidates are computed once here, place_cell keeps them up to date
+        self.candidates = array('H', [0] * 81)
+        # 81-bit mask of the cells holding each digit as a candidate
+        self.candidate_cells = [0] * 9
+        # Cells whose candidates changed, not yet handed to the unit scanning techniques
+        self.dirty_cells = 0
+        self.pending_cells = {"hidden_singles": ALL_CELLS, "naked_subsets": ALL_CELLS, "hidden_subsets": ALL_CELLS}
+        # Bumped on every change to the cells or candidates, and the revision at which each technique last found nothing
+        self.revision = 0
+        self.idle_techniques = {}
+        self.compute_candidates()
+
+    def mark_used(self, i: int, value: int):
+        r, c, b = POSITIONS[i]
+        bit = digit_bit(value)
+        self.row_used[r] |= bit
+        self.column_used[c] |= bit
+        self.box_used[b] |= bit
+
+    def unmark_used(self, i: int, value: int):
+        r, c, b = POSITIONS[i]
+        bit = digit_bit(value)
+        self.row_used[r] &= ~bit
+        self.column_used[c] &= ~bit
+        self.box_used[b] &= ~bit
 
     def place_cell(self, i: int, value: int):
         self.cells[i] = value
-        self.candidates[i] = set()
-        self.eliminate_candidates(value, i)
+        self.mark_used(i, value)
+        candidate_cells = self.candidate_cells
+        for k in BIT_POSITIONS[self.candidates[i]]:
+            candidate_cells[k] &= ~(1 << i)
+        self.candidates[i] = 0
+        self.dirty_cells |= 1 << i
+        self.revision += 1
+        # One pass over the 20 peers of the cell
+        self.eliminate_candidates_by_mask(PEER_MASKS[i], value)
+
+    def set_cell(self, r: int, c: int, value: int) -> bool:
+        """
+            Set a cell, or clear it with 0. Return False and leave the cell unchanged if the value is already used in its row, column or box.
+        """
+        if not valid_cell_value(value):
+            raise InvalidCellValue()
+        i = cell_index(r, c)
+        old_value = self.cells[i]
+        if value == old_value:
+            return True
+        if value != 0 and (self.row_used[r] | self.column_used[c] | self.box_used[BOX_OF[i]]) & digit_bit(value):
+            return False
+        if old_value != 0:
+            self.cells[i] = 0
+            self.unmark_used(i, old_value)
+            # Eliminations made by the techniques may rest on the old value anywhere on the board, start over from the used masks
+            self.compute_candidates()
+        if value != 0:
+            self.place_cell(i, value)
+        return True
 
     def unset_cell(self, r: int, c: int):
         self.set_cell(r, c, 0)
 
     def row(self, r: int) -> List[int]:
-        return self.cells[r * 9:r * 9 + 9]
+        return list(self.cells[r * 9:r * 9 + 9])
 
     def column(self, c: int) -> List[int]:
-        return self.cells[c::9]
+        return list(self.cells[c::9])
 
     def box(self, n: int) -> List[int]:
-        block_r = n // 3
-        block_c = n % 3
-        c_start = block_c * 3
-        c_end = c_start + 3
-        cells = []
-        for r in range(block_r * 3, block_r * 3 + 3):
-            cells.extend(self.row(r)[c_start:c_end])
-        return cells
-
-    def eliminate_candidates(self, value: int, i: int = None, r: int = None, c: int = None, b: int = None) -> int:
+        return list(BOX_GETTERS[n](self.cells))
+
+    def eliminate_candidates(self, value: int, i: Optional[int] = None, r: Optional[int] = None, c: Optional[int] = None, b: Optional[int] = None) -> int:
         if value == 0:
             return 0
-        cnt = 0
         if i is not None:
-            r, c, b = position(i)
+            return self.eliminate_candidates_by_mask(PEER_MASKS[i], value)
+        target_mask = 0
         if r is not None:
-            cnt += self.eliminate_candidates_of_indices(row_indices(r), value)
+            target_mask |= ROW_MASKS[r]
         if c is not None:
-            cnt += self.eliminate_candidates_of_indices(
-                column_indices(c), value)
+            target_mask |= COLUMN_MASKS[c]
         if b is not None:
-            cnt += self.eliminate_candidates_of_indices(box_indices(b), value)
-        return cnt
+            target_mask |= BOX_MASKS[b]
+        return self.eliminate_candidates_by_mask(target_mask, value)
 
     def eliminate_candidates_of_indices(self, indices: Iterable[int], value: int) -> int:
+        return self.eliminate_candidates_by_mask(cells_mask(indices), value)
+
+    def eliminate_candidates_by_mask(self, target_mask: int, value: int) -> int:
+        """
+            Eliminate the candidate value from the cells of an 81-bit mask, return the number of cells it was removed from.
+        """
+        # Only visit the target cells still holding the candidate
+        cells = target_mask & self.candidate_cells[value - 1]
+        if not cells:
+            return 0
+        self.candidate_cells[value - 1] &= ~cells
+        self.dirty_cells |= cells
+        self.revision += 1
+        candidates = self.candidates
+        keep = ALL_DIGITS & ~digit_bit(value)
         cnt = 0
-        for i in indices:
-            if value in self.candidates[i]:
-                self.candidates[i].remove(value)
-                cnt += 1
+        while cells:
+            cell = cells & -cells
+            candidates[cell.bit_length() - 1] &= keep
+            cells ^= cell
+            cnt += 1
         return cnt
 
-    def compute_candidates(self, i: int = None) -> Set[int]:
+    def compute_candidates(self, i: Optional[int] = None) -> Optional[int]:
         if i is None:
-            for i in range(81):
-                self.compute_candidates(i)
-            return
-        r, c, b = position(i)
+            # Rebuild every cell in one pass, setting only the digits present
+            candidate_cells = [0] * 9
+            cells_candidates = self.candidates
+            row_used, column_used, box_used = self.row_used, self.column_used, self.box_used
+            for i, value in enumerate(self.cells):
+                if value != 0:
+                    cells_candidates[i] = 0
+                    continue
+                r, c, b = POSITIONS[i]
+                candidates = ALL_DIGITS & ~(row_used[r] | column_used[c] | box_used[b])
+                cells_candidates[i] = candidates
+                for k in BIT_POSITIONS[candidates]:
+                    candidate_cells[k] |= 1 << i
+            self.candidate_cells = candidate_cells
+            self.dirty_cells = ALL_CELLS
+            self.revision += 1
+            return None
+        r, c, b = POSITIONS[i]
         if self.cells[i] != 0:
-            return
-        row = set(self.row(r))
-        column = set(self.column(c))
-        box = set(self.box(b))
-        candidates = {1, 2, 3, 4, 5, 6, 7, 8, 9}
-        candidates = candidates - row - column - box
+            return None
+        candidates = ALL_DIGITS & ~(self.row_used[r] | self.column_used[c] | self.box_used[b])
+        for d in range(1, 10):
+            if candidates & digit_bit(d):
+                self.candidate_cells[d - 1] |= 1 << i
+            else:
+                self.candidate_cells[d - 1] &= ~(1 << i)
         self.candidates[i] = candidates
+        self.dirty_cells |= 1 << i
+        self.revision += 1
         return candidates
 
+    def take_dirty_cells(self, technique: str) -> int:
+        """
+            Return the cells whose candidates changed since the technique last asked.
+        """
+        if self.dirty_cells:
+            for key in self.pending_cells:
+                self.pending_cells[key] |= self.dirty_cells
+            self.dirty_cells = 0
+        dirty = self.pending_cells[technique]
+        self.pending_cells[technique] = 0
+        return dirty
+
     def solve_hidden_singles(self) -> int:
         '''
-            Solve hidden singles in row, column and box. Repeat until no more hidden singles are found.
+            Solve hidden singles in row, column and box. Repeat on the changed units until no more hidden singles are found.
         '''
+        cells_candidates = self.candidates
+        candidate_cells = self.candidate_cells
+        place_cell = self.place_cell
 
-        def solve_hidden_singles_of_indices(indices: List[str]) -> int:
+        def solve_hidden_singles_of_unit(u: int) -> int:
             '''
-                Find a cell with unique candidate in a list of cells.
+                Place the digits left in a single cell of the unit, and the cells left with a single candidate.
             '''
-            candidates_sets: List[Set[int]] = [self.candidates[i]
-                                               for i in indices if len(self.candidates[i]) >= 1]
+            indices = UNITS[u]
+            # Candidates seen in at least one cell, and in at least two cells of the area
+            seen_once = 0
+            seen_twice = 0
+            for i in indices:
+                candidates = cells_candidates[i]
+                seen_twice |= seen_once & candidates
+                seen_once |= candidates
 
-            if len(candidates_sets) == 0:
+            if seen_once == 0:
                 return 0
 
             cnt = 0
-            for i in indices:
-                candidates = set(self.candidates[i])
-
-                # Check if it has a unique candidate in the area
-                if len(candidates) > 1:
-                    other_sets = [s for s in candidates_sets if s is not self.candidates[i]] or [set()]
-                    other_candidates = set.union(*other_sets)
-                    candidates -= other_candidates
+            unique_candidates = seen_once & ~seen_twice
+            while unique_candidates:
+                bit = unique_candidates & -unique_candidates
+                unique_candidates ^= bit
+                d = bit.bit_length()
+                # The cell is gone if it was just given another unique candidate
+                cells = candidate_cells[d - 1] & UNIT_MASKS[u]
+                if cells:
+                    cnt += 1
+                    place_cell(cells.bit_length() - 1, d)
 
-                # If it has a unique candidate, place it
-                if len(candidates) == 1:
+            for i in indices:
+                candidates = cells_candidates[i]
+                if POPCOUNT[candidates] == 1:
                     cnt += 1
-                    self.place_cell(i, candidates.pop())
+                    place_cell(i, candidates.bit_length())
             return cnt
 
-        cnt = 0
-        for i in range(9):
-            cnt += solve_hidden_singles_of_indices(box_indices(i))
-            cnt += solve_hidden_singles_of_indices(row_indices(i))
-            cnt += solve_hidden_singles_of_indices(column_indices(i))
-
-        if cnt > 0:
-            cnt += self.solve_hidden_singles()
-
-        return cnt
+        total = 0
+        # Only rescan the units whose candidates changed since the last scan
+        while True:
+            dirty = self.take_dirty_cells("hidden_singles")
+            if not dirty:
+                return total
+            for i in range(9):
+                for u in (18 + i, i, 9 + i):
+                    if UNIT_MASKS[u] & dirty:
+                        total += solve_hidden_singles_of_unit(u)
+
+    def count_candidates(self, indices: Iterable[int]) -> List[int]:
+        """
+            Number of cells holding each digit as a candidate, indexed by digit (index 0 is unused).
+        """
+        counts = [0] * 10
+        for i in indices:
+            for k in BIT_POSITIONS[self.candidates[i]]:
+                counts[k + 1] += 1
+        return counts
 
-    def count_candidates(self, indices: Iterable[int]) -> Dict[int, int]:
-        d = {}
-        sets = [self.candidates[i] for i in indices]
-        for s in sets:
-            for n in s:
-                d[n] = d.get(n, 0) + 1
-        return d
+    def empty_mask(self, u: int) -> int:
+        """
+            Mask of the positions of empty cells in unit u.
+        """
+        mask = 0
+        cells = self.cells
+        for p, i in enumerate(UNITS[u]):
+            if cells[i] == 0:
+                mask |= 1 << p
+        return mask
 
     def pointing_pair(self) -> int:
         """
@@ -150,33 +303,22 @@ class Sudoku:
             Same applied for rows.
         """
         cnt = 0
+        candidate_cells = self.candidate_cells
         for b in range(9):
-            bi = box_indices(b)
-            box_candidates_count = self.count_candidates(bi)
-
-            # Scan rows in box
-            for br in range(3):
-                rbi = query_indices(r=br, b=b)
-                r = b // 3 * 3 + br
-                ri = row_indices(r=r)
-                rb_candidates_count = self.count_candidates(rbi)
-                other_rb_indices = list(set(ri) - set(rbi))
-                for k, v in rb_candidates_count.items():
-                    if box_candidates_count[k] == v:
-                        cnt += self.eliminate_candidates_of_indices(
-                            other_rb_indices, k)
-
-            # Scan columns in box
-            for bc in range(3):
-                cbi = query_indices(c=bc, b=b)
-                c = b % 3 * 3 + bc
-                ci = column_indices(c=c)
-                cb_candidates_count = self.count_candidates(cbi)
-                other_cb_indices = list(set(ci) - set(cbi))
-                for k, v in cb_candidates_count.items():
-                    if box_candidates_count[k] == v:
-                        cnt += self.eliminate_candidates_of_indices(
-                            other_cb_indices, k)
+            for d in range(1, 10):
+                cells = candidate_cells[d - 1] & BOX_MASKS[b]
+                if not cells:
+                    continue
+
+                # Scan rows in box
+                for br in range(3):
+                    if not cells & ~BOX_ROW_MASKS[b][br]:
+                        cnt += self.eliminate_candidates_by_mask(ROW_OUTSIDE_BOX_MASKS[b][br], d)
+
+                # Scan columns in box
+                for bc in range(3):
+                    if not cells & ~BOX_COLUMN_MASKS[b][bc]:
+                        cnt += self.eliminate_candidates_by_mask(COLUMN_OUTSIDE_BOX_MASKS[b][bc], d)
         return cnt
 
     def box_line_reduction(self) -> int:
@@ -186,36 +328,34 @@ class Sudoku:
             Same applied for each row.
         """
         cnt = 0
-        for r in range(9):
-            candidate_counts = self.count_candidates(row_indices(r))
-            for k, v in candidate_counts.items():
-                if v not in (2, 3):
-                    continue
-                _indices = set(i for i in row_indices(
-                    r) if k in self.candidates[i])
+        for x in range(1, 10):
+            row_masks, column_masks = self.digit_masks(x)
 
-                _positions = [position(i) for i in _indices]
-                _boxes = set(p[2] for p in _positions)
+            for r in range(9):
+                if POPCOUNT[row_masks[r]] not in (2, 3):
+                    continue
+                # Boxes of the row holding the candidate
+                _boxes = [k for k in range(3) if row_masks[r] >> k * 3 & 0b111]
                 if len(_boxes) != 1:
                     continue
-                b = _boxes.pop()
-                bi = set(box_indices(b)) - _indices
-                cnt += self.eliminate_candidates_of_indices(bi, k)
-
-        for c in range(9):
-            candidate_counts = self.count_candidates(column_indices(c))
-            for k, v in candidate_counts.items():
-                if v not in (2, 3):
+                b = r // 3 * 3 + _boxes[0]
+                eliminated = self.eliminate_candidates_by_mask(BOX_OUTSIDE_ROW_MASKS[b][r % 3], x)
+                if eliminated > 0:
+                    cnt += eliminated
+                    row_masks, column_masks = self.digit_masks(x)
+
+            for c in range(9):
+                if POPCOUNT[column_masks[c]] not in (2, 3):
                     continue
-                _indices = set(i for i in column_indices(
-                    c) if k in self.candidates[i])
-                _positions = [position(i) for i in _indices]
-                _boxes = set(p[2] for p in _positions)
+                # Boxes of the column holding the candidate
+                _boxes = [k for k in range(3) if column_masks[c] >> k * 3 & 0b111]
                 if len(_boxes) != 1:
                     continue
-                b = _boxes.pop()
-                bi = set(box_indices(b)) - _indices
-                cnt += self.eliminate_candidates_of_indices(bi, k)
+                b = _boxes[0] * 3 + c // 3
+                eliminated = self.eliminate_candidates_by_mask(BOX_OUTSIDE_COLUMN_MASKS[b][c % 3], x)
+                if eliminated > 0:
+                    cnt += eliminated
+                    row_masks, column_masks = self.digit_masks(x)
 
         return cnt
 
@@ -224,37 +364,38 @@ class Sudoku:
             For each 2 boxes in same direction, if they have a candidate only lies within 2 rows (or columns), remove candidates of that number from 2 rows in the other box.
         """
         cnt = 0
+        candidate_cells = self.candidate_cells
         for x in range(1, 10):
             # Check horizontal boxes
             for k in range(3):
                 boxes = set(k * 3 + i for i in range(3))
-                pairs = [set(pair) for pair in combinations(boxes, 2)]
-                for pair in pairs:
-                    b1, b2 = pair
-                    rb1 = set(row_of(i) for i in box_indices(b1) if x in self.candidates[i])
-                    rb2 = set(row_of(i) for i in box_indices(b2) if x in self.candidates[i])
+                for b1, b2 in combinations(boxes, 2):
+                    cells1 = candidate_cells[x - 1] & BOX_MASKS[b1]
+                    cells2 = candidate_cells[x - 1] & BOX_MASKS[b2]
+                    rb1 = sum(1 << r for r in BOX_ROWS[b1] if cells1 & ROW_MASKS[r])
+                    rb2 = sum(1 << r for r in BOX_ROWS[b2] if cells2 & ROW_MASKS[r])
                     rows = rb1 | rb2
-                    if len(rb1) == 0 or len(rb2) == 0 or len(rows) != 2:
+                    if rb1 == 0 or rb2 == 0 or POPCOUNT[rows] != 2:
                         continue
-                    other_box_i = (boxes - pair).pop()
-                    indices = [i for i in box_indices(other_box_i) if row_of(i) in rb1]
-                    cnt += self.eliminate_candidates_of_indices(indices, x)
+                    other_box_i = (boxes - {b1, b2}).pop()
+                    target_mask = BOX_MASKS[other_box_i] & reduce(or_, (ROW_MASKS[r] for r in BIT_POSITIONS[rb1]))
+                    cnt += self.eliminate_candidates_by_mask(target_mask, x)
 
             # Check vertical boxes
             for k in range(3):
                 boxes = set(k + i * 3 for i in range(3))
-                pairs = [set(pair) for pair in combinations(boxes, 2)]
-                for pair in pairs:
-                    b1, b2 = pair
-                    cb1 = set(column_of(i) for i in box_indices(b1) if x in self.candidates[i])
-                    cb2 = set(column_of(i) for i in box_indices(b2) if x in self.candidates[i])
+                for b1, b2 in combinations(boxes, 2):
+                    cells1 = candidate_cells[x - 1] & BOX_MASKS[b1]
+                    cells2 = candidate_cells[x - 1] & BOX_MASKS[b2]
+                    cb1 = sum(1 << c for c in BOX_COLUMNS[b1] if cells1 & COLUMN_MASKS[c])
+                    cb2 = sum(1 << c for c in BOX_COLUMNS[b2] if cells2 & COLUMN_MASKS[c])
                     columns = cb1 | cb2
-                    if len(cb1) == 0 or len(cb2) == 0 or len(columns) != 2:
+                    if cb1 == 0 or cb2 == 0 or POPCOUNT[columns] != 2:
                         continue
 
-                    other_box_i = (boxes - pair).pop()
-                    indices = [i for i in box_indices(other_box_i) if column_of(i) in columns]
-                    cnt += self.eliminate_candidates_of_indices(indices, x)
+                    other_box_i = (boxes - {b1, b2}).pop()
+                    target_mask = BOX_MASKS[other_box_i] & reduce(or_, (COLUMN_MASKS[c] for c in BIT_POSITIONS[columns]))
+                    cnt += self.eliminate_candidates_by_mask(target_mask, x)
 
         return cnt
 
@@ -263,32 +404,42 @@ class Sudoku:
             For each area (box, column or row), check for each subset of size k from 2 to 4, if it has k candidates that do not belong other cells in the area,
             eliminate all other candidates that are belong to other cells in the area.
         """
-        def eliminate_hidden_subsets_of_indices(indices: List[str]) -> int:
+        cells_candidates = self.candidates
+        eliminate = self.eliminate_candidates_by_mask
+
+        def unit_digit_positions(u: int) -> List[int]:
+            # Positions in the unit of the cells holding each digit
+            digit_positions = [0] * 9
+            for p, i in enumerate(UNITS[u]):
+                for k in BIT_POSITIONS[cells_candidates[i]]:
+                    digit_positions[k] |= 1 << p
+            return digit_positions
+
+        def eliminate_hidden_subsets_of_unit(u: int) -> int:
             cnt = 0
-            for size in range(2, min(4, len(indices))):
-                indices_subsets = list(combinations(indices, size))
-                for subset_indices in indices_subsets:
-                    subset_candidates = set.union(
-                        *[self.candidates[i] for i in subset_indices])
-                    other_indices = list(set(indices) - set(subset_indices))
-                    other_candidates = set.union(
-                        *[self.candidates[i] for i in other_indices])
-                    subset_unique_candidates = subset_candidates - other_candidates
-                    # If the subset (size k) has k candidates that does not belong to other cells, eliminate other candidates in the subset that belong to other cells.
-                    if len(subset_unique_candidates) == size:
-                        for candidate in other_candidates:
-                            cnt += self.eliminate_candidates_of_indices(
-                                subset_indices, candidate)
+            empty_mask = self.empty_mask(u)
+            digit_positions = unit_digit_positions(u)
+            for size in range(2, 5):
+                # With fewer than k other empty cells, the complement is a smaller subset of the other kind
+                if POPCOUNT[empty_mask] < 2 * size:
+                    break
+                # k digits confined to the same k cells, eliminate the other candidates of these cells
+                eliminated = 0
+                for subset_digits, subset_positions in find_subsets(digit_positions, size):
+                    subset_cells = UNIT_SUBSET_CELLS[u][subset_positions]
+                    for k in BIT_POSITIONS[ALL_DIGITS & ~subset_digits]:
+                        if digit_positions[k] & subset_positions:
+                            eliminated += eliminate(subset_cells, k + 1)
+                if eliminated > 0:
+                    cnt += eliminated
+                    digit_positions = unit_digit_positions(u)
             return cnt
 
         cnt = 0
-        for x in range(9):
-            bi = [i for i in box_indices(x) if self.cells[i] == 0]
-            ri = [i for i in row_indices(x) if self.cells[i] == 0]
-            ci = [i for i in column_indices(x) if self.cells[i] == 0]
-            cnt += eliminate_hidden_subsets_of_indices(bi)
-            cnt += eliminate_hidden_subsets_of_indices(ri)
-            cnt += eliminate_hidden_subsets_of_indices(ci)
+        dirty = self.take_dirty_cells("hidden_subsets")
+        for u in range(27):
+            if UNIT_MASKS[u] & dirty:
+                cnt += eliminate_hidden_subsets_of_unit(u)
 
         return cnt
 
@@ -296,185 +447,157 @@ class Sudoku:
         """
             For each area (box, column or row), check for naked subset of size k from 2 to 4. If it has k candidates, then eliminate those candidates from other cells in the area.
         """
-        def eliminate_naked_subsets_of_indices(indices: List[str]):
+        cells_candidates = self.candidates
+        eliminate = self.eliminate_candidates_by_mask
+
+        def eliminate_naked_subsets_of_unit(u: int) -> int:
             cnt = 0
-            for size in range(2, min(4, len(indices))):
-                indices_subsets = list(combinations(indices, size))
-                for subset_indices in indices_subsets:
-                    subset_candidates = set.union(
-                        *[self.candidates[i] for i in subset_indices])
-                    if len(subset_candidates) == size:
-                        other_indices = list(
-                            set(indices) - set(subset_indices))
-                        for candidate in subset_candidates:
-                            cnt += self.eliminate_candidates_of_indices(
-                                other_indices, candidate)
+            empty_mask = self.empty_mask(u)
+            unit_candidates = [cells_candidates[i] for i in UNITS[u]]
+            for size in range(2, 5):
+                # With fewer than k other empty cells, the complement is a smaller subset of the other kind
+                if POPCOUNT[empty_mask] < 2 * size:
+                    break
+                # k cells holding only the same k candidates, eliminate these candidates from the other cells
+                eliminated = 0
+                for subset_positions, subset_candidates in find_subsets(unit_candidates, size):
+                    other_cells = UNIT_MASKS[u] & ~UNIT_SUBSET_CELLS[u][subset_positions]
+                    for candidate in iter_digits(subset_candidates):
+                        eliminated += eliminate(other_cells, candidate)
+                if eliminated > 0:
+                    cnt += eliminated
+                    unit_candidates = [cells_candidates[i] for i in UNITS[u]]
             return cnt
 
         cnt = 0
-        for x in range(9):
-            bi = [i for i in box_indices(x) if self.cells[i] == 0]
-            ri = [i for i in row_indices(x) if self.cells[i] == 0]
-            ci = [i for i in column_indices(x) if self.cells[i] == 0]
-            cnt += eliminate_naked_subsets_of_indices(bi)
-            cnt += eliminate_naked_subsets_of_indices(ri)
-            cnt += eliminate_naked_subsets_of_indices(ci)
+        dirty = self.take_dirty_cells("naked_subsets")
+        for u in range(27):
+            if UNIT_MASKS[u] & dirty:
+                cnt += eliminate_naked_subsets_of_unit(u)
 
         return cnt
 
-    def x_wing(self, n=2) -> int:
+    def digit_masks(self, x: int) -> Tuple[List[int], List[int]]:
+        """
+            For digit x, return the mask of columns holding the candidate in each row, and the mask of rows holding it in each column.
+        """
+        cells = self.candidate_cells[x - 1]
+        row_masks = [cells >> r * 9 & ALL_DIGITS for r in range(9)]
+        column_masks = [0] * 9
+        while cells:
+            cell = cells & -cells
+            i = cell.bit_length() - 1
+            column_masks[COLUMN_OF[i]] |= 1 << ROW_OF[i]
+            cells ^= cell
+        return row_masks, column_masks
+
+    def x_wing(self, n: int = 2) -> int:
         """
             Detect x-wing in row or column then eliminate that candidate from intersecting cells.
         """
         cnt = 0
         # Detect x-wing in rows
         for x in range(1, 10):
-            valid_rows = []
+            row_masks, _ = self.digit_masks(x)
+            valid_rows = sum(1 << r for r in range(9) if 2 <= POPCOUNT[row_masks[r]] <= n)
 
-            for r in range(9):
-                candidate_counts = self.count_candidates(row_indices(r))
-                if not 2 <= candidate_counts.get(x, 0) <= n:
+            for row_mask in submasks(valid_rows, n):
+                column_mask = reduce(or_, (row_masks[r] for r in BIT_POSITIONS[row_mask]))
+                if POPCOUNT[column_mask] != n:
                     continue
-                valid_rows.append(r)
-
-            if len(valid_rows) < n:
-                continue
-
-            combs = list(combinations(valid_rows, n))
-
-            for rows in combs:
-                indices = set()
-                for r in rows:
-                    ri = set(i for i in row_indices(r) if x in self.candidates[i])
-                    indices.update(ri)
-                columns = set(column_of(i) for i in indices)
-                if len(columns) == n:
-                    for c in columns:
-                        _ci = set(i for i in column_indices(c) if row_of(i) not in rows)
-                        cnt += self.eliminate_candidates_of_indices(_ci, x)
+                fish_columns = reduce(or_, (COLUMN_MASKS[c] for c in BIT_POSITIONS[column_mask]))
+                fish_rows = reduce(or_, (ROW_MASKS[r] for r in BIT_POSITIONS[row_mask]))
+                eliminated = self.eliminate_candidates_by_mask(fish_columns & ~fish_rows, x)
+                if eliminated > 0:
+                    cnt += eliminated
+                    row_masks, _ = self.digit_masks(x)
 
         # Detect x-wing in columns
         for x in range(1, 10):
-            valid_columns = []
+            _, column_masks = self.digit_masks(x)
+            valid_columns = sum(1 << c for c in range(9) if 2 <= POPCOUNT[column_masks[c]] <= n)
 
-            for c in range(9):
-                candidate_counts = self.count_candidates(column_indices(c))
-                if not 2 <= candidate_counts.get(x, 0) <= n:
+            for column_mask in submasks(valid_columns, n):
+                row_mask = reduce(or_, (column_masks[c] for c in BIT_POSITIONS[column_mask]))
+                if POPCOUNT[row_mask] != n:
                     continue
-                valid_columns.append(c)
-
-            if len(valid_columns) < n:
-                continue
-
-            combs = list(combinations(valid_columns, n))
-
-            for columns in combs:
-                indices = set()
-                for c in columns:
-                    ci = set(i for i in column_indices(c) if x in self.candidates[i])
-                    indices.update(ci)
-                rows = set(row_of(i) for i in indices)
-                if len(rows) == n:
-                    for r in rows:
-                        _ri = set(i for i in row_indices(r) if column_of(i) not in columns)
-                        cnt += self.eliminate_candidates_of_indices(_ri, x)
+                fish_rows = reduce(or_, (ROW_MASKS[r] for r in BIT_POSITIONS[row_mask]))
+                fish_columns = reduce(or_, (COLUMN_MASKS[c] for c in BIT_POSITIONS[column_mask]))
+                eliminated = self.eliminate_candidates_by_mask(fish_rows & ~fish_columns, x)
+                if eliminated > 0:
+                    cnt += eliminated
+                    _, column_masks = self.digit_masks(x)
         return cnt
 
     def y_wing(self) -> int:
         cnt = 0
+        cells = self.cells
+        cells_candidates = self.candidates
+        eliminate = self.eliminate_candidates_by_mask
         for i in range(81):
-            if self.cells[i] != 0:
+            if cells[i] != 0:
                 continue
-            candidates = self.candidates[i]
-            if len(candidates) != 2:
+            candidates = cells_candidates[i]
+            if POPCOUNT[candidates] != 2:
                 continue
             # Assume that current cell is pivot of y-wing
-            r, c, b = position(i)
+            r, c, b = POSITIONS[i]
 
             pincers_column = []
             pincers_row = []
             pincers_box = []
 
-            # Check for pincers in column
-            for _r in range(0, 9):
-                _i = cell_index(_r, c)
-                _candidates = self.candidates[_i]
-                _b = box_of_i(_i)
-                if b == _b:
-                    continue
-                if len(_candidates) != 2:
+            for _i in PEERS[i]:
+                _candidates = cells_candidates[_i]
+                if POPCOUNT[_candidates] != 2:
                     continue
                 # Take if there is one candidate in common
-                if len(_candidates & candidates) == 1:
-                    pincers_column.append(_i)
-
-            # Check for pincers in row
-            for _c in range(0, 9):
-                _i = cell_index(r, _c)
-                _candidates = self.candidates[_i]
-                _b = box_of_i(_i)
-                if b == _b:
+                if POPCOUNT[_candidates & candidates] != 1:
                     continue
-                if len(_candidates) != 2:
-                    continue
-                # Take if there is one candidate in common
-                if len(_candidates & candidates) == 1:
-                    pincers_row.append(_i)
-
-            # Check for pincers in box
-            for _r in range(r // 3 * 3, r // 3 * 3 + 3):
-                for _c in range(c // 3 * 3, c // 3 * 3 + 3):
-                    # Skip if the two cells are in the same column or row
-                    if _r == r or _c == c:
-                        continue
-
-                    _i = cell_index(_r, _c)
-                    _candidates = self.candidates[_i]
-                    if len(_candidates) != 2:
-                        continue
-                    # Take if there is one candidate in common
-                    if len(_candidates & candidates) == 1:
-                        pincers_box.append(_i)
+                if BOX_OF[_i] != b:
+                    if COLUMN_OF[_i] == c:
+                        pincers_column.append(_i)
+                    else:
+                        pincers_row.append(_i)
+                # Skip box cells in the same column or row
+                elif ROW_OF[_i] != r and COLUMN_OF[_i] != c:
+                    pincers_box.append(_i)
 
             pincers_rc = product(pincers_column, pincers_row)
             pincers_rb = product(pincers_row, pincers_box)
             pincers_cb = product(pincers_column, pincers_box)
 
-            cnt = 0
-
             for i1, i2 in pincers_rc:
-                if self.candidates[i1] ^ self.candidates[i2] == candidates:
+                if cells_candidates[i1] ^ cells_candidates[i2] == candidates:
                     candidate_to_eliminiate = (
-                        self.candidates[i1] & self.candidates[i2]).pop()
+                        cells_candidates[i1] & cells_candidates[i2]).bit_length()
                     # Intersect positions of pincers
-                    r1, c1, _ = position(i1)
-                    r2, c2, _ = position(i2)
-                    cnt += self.eliminate_candidates_of_indices(
-                        [cell_index(r1, c2), cell_index(r2, c1)], candidate_to_eliminiate)
+                    r1, c1, _ = POSITIONS[i1]
+                    r2, c2, _ = POSITIONS[i2]
+                    cnt += eliminate(
+                        1 << cell_index(r1, c2) | 1 << cell_index(r2, c1), candidate_to_eliminiate)
 
             for i1, i2 in pincers_rb:
-                if self.candidates[i1] ^ self.candidates[i2] == candidates:
+                if cells_candidates[i1] ^ cells_candidates[i2] == candidates:
                     candidate_to_eliminiate = (
-                        self.candidates[i1] & self.candidates[i2]).pop()
-                    r1, _, b1 = position(i1)
-                    r2, _, b2 = position(i2)
+                        cells_candidates[i1] & cells_candidates[i2]).bit_length()
+                    r1, _, b1 = POSITIONS[i1]
+                    r2, _, b2 = POSITIONS[i2]
                     # Remove candidates from the same row of the other pincer box.
-                    cnt += self.eliminate_candidates_of_indices(
-                        set(query_indices(r=r1 % 3, b=b2)) | set(
-                            query_indices(r=r2 % 3, b=b1)),
+                    cnt += eliminate(
+                        BOX_ROW_MASKS[b2][r1 % 3] | BOX_ROW_MASKS[b1][r2 % 3],
                         candidate_to_eliminiate
                     )
 
             for i1, i2 in pincers_cb:
-                if self.candidates[i1] ^ self.candidates[i2] == candidates:
+                if cells_candidates[i1] ^ cells_candidates[i2] == candidates:
                     candidate_to_eliminiate = (
-                        self.candidates[i1] & self.candidates[i2]).pop()
-                    _, c1, b1 = position(i1)
-                    _, c2, b2 = position(i2)
+                        cells_candidates[i1] & cells_candidates[i2]).bit_length()
+                    _, c1, b1 = POSITIONS[i1]
+                    _, c2, b2 = POSITIONS[i2]
                     # Remove candidates from the same column of the other pincer box.
-                    cnt += self.eliminate_candidates_of_indices(
-                        set(query_indices(c=c1 % 3, b=b2)) | set(
-                            query_indices(c=c2 % 3, b=b1)),
+                    cnt += eliminate(
+                        BOX_COLUMN_MASKS[b2][c1 % 3] | BOX_COLUMN_MASKS[b1][c2 % 3],
                         candidate_to_eliminiate
                     )
 
@@ -494,124 +617,158 @@ class Sudoku:
 
     def xyz_wing(self) -> int:
         cnt = 0
+        cells = self.cells
+        cells_candidates = self.candidates
+        eliminate = self.eliminate_candidates_by_mask
         for i in range(81):
-            if self.cells[i] != 0:
+            if cells[i] != 0:
                 continue
-            candidates = self.candidates[i]
-            if len(candidates) != 3:
+            candidates = cells_candidates[i]
+            if POPCOUNT[candidates] != 3:
                 continue
             # Assume that current cell is pivot of xyz-wing
-            r, c, b = position(i)
+            r, c, b = POSITIONS[i]
 
             pincers_column = []
             pincers_row = []
             pincers_box = []
 
-            # Check for pincers in column
-            for _r in range(0, 9):
-                _i = cell_index(_r, c)
-                _candidates = self.candidates[_i]
-                _b = box_of_i(_i)
-                if _b == b:
-                    continue
-                if len(_candidates) != 2:
+            for _i in PEERS[i]:
+                _candidates = cells_candidates[_i]
+                if POPCOUNT[_candidates] != 2:
                     continue
                 # Take if there is two candidates in common
-                if len(_candidates & candidates) == 2:
-                    pincers_column.append(_i)
-
-            # Check for pincers in row
-            for _c in range(0, 9):
-                _i = cell_index(r, _c)
-                _candidates = self.candidates[_i]
-                _b = box_of_i(_i)
-                if _b == b:
-                    continue
-                if len(_candidates) != 2:
+                if POPCOUNT[_candidates & candidates] != 2:
                     continue
-                # Take if there is two candidates in common
-                if len(_candidates & candidates) == 2:
-                    pincers_row.append(_i)
-
-            # Check for pincers in box
-            for _r in range(r // 3 * 3, r // 3 * 3 + 3):
-                for _c in range(c // 3 * 3, c // 3 * 3 + 3):
-                    if _r == r and _c == c:
-                        continue
-                    _i = cell_index(_r, _c)
-                    _candidates = self.candidates[_i]
-                    if len(_candidates) != 2:
-                        continue
-                    # Take if there is two candidate in common
-                    if len(_candidates & candidates) == 2:
-                        pincers_box.append(_i)
+                if BOX_OF[_i] != b:
+                    if COLUMN_OF[_i] == c:
+                        pincers_column.append(_i)
+                    else:
+                        pincers_row.append(_i)
+                else:
+                    pincers_box.append(_i)
 
             pincers_rb = product(pincers_row, pincers_box)
             pincers_cb = product(pincers_column, pincers_box)
 
-            cnt = 0
-
             for ir, ib in pincers_rb:
-                if self.candidates[ir] | self.candidates[ib] == candidates:
-                    candidate_to_eliminiate = (self.candidates[ir] & self.candidates[ib]).pop()
-                    rir = row_of(ir)
-                    rib = row_of(ib)
+                if cells_candidates[ir] | cells_candidates[ib] == candidates:
+                    candidate_to_eliminiate = (cells_candidates[ir] & cells_candidates[ib]).bit_length()
+                    rir = ROW_OF[ir]
+                    rib = ROW_OF[ib]
                     # Exception: 2 pincers and pivot in the same row
                     if rir == rib:
                         continue
-                    print(f"xyz-wing: Eliminate {candidate_to_eliminiate} from row {rir} and box {b}")
+                    if self.verbose:
+                        print(f"xyz-wing: Eliminate {candidate_to_eliminiate} from row {rir} and box {b}")
                     # Remove the common candidate in the same row and same box of the pivot
-                    cnt += self.eliminate_candidates_of_indices(
-                        set(query_indices(r=r % 3, b=b)) - {i},
+                    cnt += eliminate(
+                        BOX_ROW_MASKS[b][r % 3] & ~(1 << i),
                         candidate_to_eliminiate
                     )
 
             for ic, ib in pincers_cb:
-                if self.candidates[ic] | self.candidates[ib] == candidates:
-                    candidate_to_eliminiate = (self.candidates[ic] & self.candidates[ib]).pop()
+                if cells_candidates[ic] | cells_candidates[ib] == candidates:
+                    candidate_to_eliminiate = (cells_candidates[ic] & cells_candidates[ib]).bit_length()
                     # Exception: 2 pincers and pivot in the same column
-                    if column_of(ic) == column_of(ib):
+                    if COLUMN_OF[ic] == COLUMN_OF[ib]:
                         continue
                     # Remove the common candidate in the same column and same box of the pivot
-                    cnt += self.eliminate_candidates_of_indices(
-                        set(query_indices(c=c % 3, b=b)) - {i},
+                    cnt += eliminate(
+                        BOX_COLUMN_MASKS[b][c % 3] & ~(1 << i),
                         candidate_to_eliminiate
                     )
 
         return cnt
 
     def eliminate_using_all_techniques(self) -> int:
-        cnt = 0
-        cnt += self.pointing_pair()
-        cnt += self.box_line_reduction()
-        cnt += self.box_box_reduction()
-        cnt += self.naked_subsets()
-        cnt += self.hidden_subsets()
-        cnt += self.y_wing()
-        cnt += self.x_wing()
-        cnt += self.xyz_wing()
-        cnt += self.swordfish()
-        cnt += self.jellyfish()
-        if cnt > 0:
-            cnt += self.eliminate_using_all_techniques()
-        return cnt
+        """
+            Apply techniques from the cheapest to the most expensive. Whenever one eliminates candidates, start over from the cheapest.
+        """
+        techniques = (
+            self.pointing_pair,
+            self.box_line_reduction,
+            self.box_box_reduction,
+            self.naked_subsets,
+            self.hidden_subsets,
+            self.x_wing,
+            self.y_wing,
+            self.xyz_wing,
+            self.swordfish,
+            self.jellyfish,
+        )
+        total = 0
+        while True:
+            for technique in techniques:
+                # Nothing changed since the technique last found nothing
+                if self.idle_techniques.get(technique.__name__) == self.revision:
+                    continue
+                cnt = technique()
+                if cnt > 0:
+                    total += cnt
+                    break
+                self.idle_techniques[technique.__name__] = self.revision
+            else:
+                return total
+
+    def solve_by_exact_cover(self) -> int:
+        """
+            Fill the remaining cells by searching an exact cover of the constraints left: each empty cell gets one digit,
+            each digit missing from a row, column or box is placed once. Used when techniques alone cannot solve the sudoku.
+        """
+        # Columns: 0-80 cells, 81-161 row/digit, 162-242 column/digit, 243-323 box/digit
+        X: Dict[int, Set[int]] = {}
+        for i in range(81):
+            if self.cells[i] == 0:
+                X[i] = set()
+        for k in range(9):
+            for d in range(1, 10):
+                bit = digit_bit(d)
+                if not self.row_used[k] & bit:
+                    X[81 + k * 9 + d - 1] = set()
+                if not self.column_used[k] & bit:
+                    X[162 + k * 9 + d - 1] = set()
+                if not self.box_used[k] & bit:
+                    X[243 + k * 9 + d - 1] = set()
+
+        # Rows: i * 9 + d - 1 for every candidate d of an empty cell i
+        Y: Dict[int, Tuple[int, ...]] = {}
+        for i in range(81):
+            r, c, b = POSITIONS[i]
+            for d in iter_digits(self.candidates[i]):
+                columns = (i, 81 + r * 9 + d - 1, 162 + c * 9 + d - 1, 243 + b * 9 + d - 1)
+                if all(j in X for j in columns):
+                    Y[i * 9 + d - 1] = columns
+                    for j in columns:
+                        X[j].add(i * 9 + d - 1)
+
+        solution = next(solve_exact_cover(X, Y), None)
+        if solution is None:
+            return 0
+        for row in solution:
+            self.place_cell(row // 9, row % 9 + 1)
+        return len(solution)
 
-    def solve(self, is_recursive=False) -> int:
-        cnt = 0
-        if not is_recursive:
-            self.compute_candidates()
-            cnt += self.solve_hidden_singles()
-        self.eliminate_using_all_techniques()
-        cnt += self.solve_hidden_singles()
-        if cnt > 0:
-            cnt += self.solve(is_recursive=True)
+    def solve(self, fallback: bool = True) -> int:
+        """
+            Solve with the techniques, then fill the cells they leave with the exact cover search unless fallback is False.
+        """
+        cnt = self.solve_hidden_singles()
+        while 0 in self.cells:
+            self.eliminate_using_all_techniques()
+            solved = self.solve_hidden_singles()
+            if solved == 0:
+                break
+            cnt += solved
+        if fallback and not self.solved and self.valid:
+            cnt += self.solve_by_exact_cover()
         return cnt
 
-    def solve_and_display(self) -> Sudoku:
+    def solve_and_display(self) -> Optional[Sudoku]:
         print(f"🔢 {self.name}")
         if not self.valid:
             print(f"❗ Invalid {self.name}!")
-            return
+            return None
         self.display()
         print(f"⌛ Solving {self.name}...")
         start = timer()
@@ -630,63 +787,81 @@ class Sudoku:
 
     @ property
     def valid(self) -> bool:
-        for i in range(9):
-            column = [v for v in self.column(i) if v != 0]
-            box = [v for v in self.box(i) if v != 0]
-            row = [v for v in self.row(i) if v != 0]
-
-            if len(set(column)) != len(column):
-                return False
-            if len(set(box)) != len(box):
-                return False
-            if len(set(row)) != len(row):
+        row_used = [0] * 9
+        column_used = [0] * 9
+        box_used = [0] * 9
+        for i, v in enumerate(self.cells):
+            if v == 0:
+                continue
+            r, c, b = POSITIONS[i]
+            bit = digit_bit(v)
+            if (row_used[r] | column_used[c] | box_used[b]) & bit:
                 return False
+            row_used[r] |= bit
+            column_used[c] |= bit
+            box_used[b] |= bit
         return True
 
     @ property
     def solved(self) -> bool:
-        return self.valid and all(v != 0 for v in self.cells)
+        return 0 not in self.cells and self.valid
 
     @ classmethod
-    def from_file(cls, filename: str):
+    def from_file(cls, filename: str) -> Sudoku:
         sudoku = cls()
         sudoku.set_cells(load_cells_from_file(filename))
         return sudoku
 
+    @ staticmethod
+    def solve_many(puzzles: Iterable[List[int]], workers: Optional[int] = None) -> List[List[int]]:
+        """
+            Solve puzzles in parallel worker processes, returning the cells of each puzzle after solving, in order.
+        """
+        puzzles = list(puzzles)
+        workers = workers or os.cpu_count() or 1
+        chunksize = max(1, len(puzzles) // (workers * 4))
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            return list(executor.map(solve_cells, puzzles, chunksize=chunksize))
+
+    def render_row(self, r: int) -> str:
+        row = self.row(r)
+        return " | ".join(" ".join(str(v) for v in row[k * 3:k * 3 + 3]) for k in range(3)).translate(BLANK_ZEROS)
+
+    def render(self) -> str:
+        lines = []
+        for r in range(9):
+            lines.append(self.render_row(r))
+            if r in (2, 5):
+                lines.append("------+-------+------")
+        return "\n".join(lines)
+
+    def render_candidates(self) -> str:
+        lines = []
+        for r in range(9):
+            row = ROW_INDICES[r]
+            lines.append(" | ".join(
+                " ".join(DIGIT_STRINGS[self.candidates[i]] for i in row[k * 3:k * 3 + 3])
+                for k in range(3)
+            ))
+            if r in (2, 5):
+                lines.append("-" * 33 + "+" + "-" * 34 + "+" + "-" * 33)
+        return "\n".join(lines)
+
     def display(self):
-        for r1 in range(3):
-            for r2 in range(3):
-                r = r1 * 3 + r2
-                self.display_row(r)
-            if r1 < 2:
-                print("------+-------+------")
+        print(self.render())
         print()
 
     def display_row(self, r: int):
-        row = self.row(r)
-        for i in range(3):
-            for j in range(3):
-                s = str(row[i * 3 + j])
-                s = s.replace("0", "_")
-                print(s, end=" ")
-            if i < 2:
-                print("|", end=" ")
-        print()
+        print(self.render_row(r))
 
     def display_candidates(self):
-        def display_set(i: int):
-            print("".join(str(n)
-                  for n in self.candidates[i]).center(10), end=" ")
-        for r1 in range(3):
-            for r2 in range(3):
-                r = r1 * 3 + r2
-                for c1 in range(3):
-                    for c2 in range(3):
-                        c = c1 * 3 + c2
-                        i = cell_index(r, c)
-                        display_set(i)
-                    if c1 < 2:
-                        print("|", end=" ")
-                print()
-            if r1 < 2:
-                print("-" * 33 + "+" + "-" * 34 + "+" + "-" * 33)
+        print(self.render_candidates())
+
+
+def solve_cells(cells: List[int]) -> List[int]:
+    """
+        Solve a single puzzle. Module level so that worker processes of Sudoku.solve_many can pickle it.
+    """
+    sudoku = Sudoku(list(cells))
+    sudoku.solve()
+    return list(sudoku.cells)
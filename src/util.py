@@ -1,88 +1,202 @@
 
-from typing import List, Tuple
+from functools import lru_cache
+from itertools import combinations
+from operator import itemgetter
+from typing import Iterable, Iterator, List, Optional, Sequence, Tuple
+
+# Candidates of a cell are stored as a 9-bit mask, bit k set means digit k + 1 is possible.
+ALL_DIGITS = 0x1FF
+
+# Number of candidates of every possible mask.
+POPCOUNT = tuple(bin(m).count("1") for m in range(ALL_DIGITS + 1))
+
+# Positions of the bits set in every 9-bit mask.
+BIT_POSITIONS = tuple(tuple(k for k in range(9) if m >> k & 1) for m in range(ALL_DIGITS + 1))
+
+# Index tables, computed once at import time.
+ROW_INDICES = tuple(tuple(r * 9 + c for c in range(9)) for r in range(9))
+COLUMN_INDICES = tuple(tuple(r * 9 + c for r in range(9)) for c in range(9))
+BOX_INDICES = tuple(
+    tuple((b // 3 * 3 + r) * 9 + b % 3 * 3 + c for r in range(3) for c in range(3)) for b in range(9)
+)
+
+# BOX_GETTERS[b](cells) gathers the values of box b in one call
+BOX_GETTERS = tuple(itemgetter(*indices) for indices in BOX_INDICES)
+
+ROW_OF = tuple(i // 9 for i in range(81))
+COLUMN_OF = tuple(i % 9 for i in range(81))
+BOX_OF = tuple(i // 27 * 3 + i % 9 // 3 for i in range(81))
+POSITIONS = tuple((ROW_OF[i], COLUMN_OF[i], BOX_OF[i]) for i in range(81))
+BOX_ROWS = tuple(tuple(b // 3 * 3 + i for i in range(3)) for b in range(9))
+BOX_COLUMNS = tuple(tuple(b % 3 * 3 + i for i in range(3)) for b in range(9))
+
+# The 20 cells sharing a row, column or box with each cell.
+PEERS = tuple(
+    tuple(sorted((set(ROW_INDICES[r]) | set(COLUMN_INDICES[c]) | set(BOX_INDICES[b])) - {i}))
+    for i, (r, c, b) in enumerate(POSITIONS)
+)
+
+# All 27 units: rows, then columns, then boxes.
+UNITS = ROW_INDICES + COLUMN_INDICES + BOX_INDICES
+
+
+def cells_mask(indices: Iterable[int]) -> int:
+    """
+        81-bit mask of a group of cells, bit i set for cell i.
+    """
+    mask = 0
+    for i in indices:
+        mask |= 1 << i
+    return mask
+
+
+UNIT_MASKS = tuple(cells_mask(unit) for unit in UNITS)
+ROW_MASKS = UNIT_MASKS[:9]
+COLUMN_MASKS = UNIT_MASKS[9:18]
+BOX_MASKS = UNIT_MASKS[18:]
+PEER_MASKS = tuple(cells_mask(peers) for peers in PEERS)
+ALL_CELLS = cells_mask(range(81))
+
+
+def unit_subset_cells(unit: Tuple[int, ...]) -> Tuple[int, ...]:
+    """
+        81-bit mask of the cells of the unit for every 9-bit mask of positions in the unit.
+    """
+    masks = [0] * (ALL_DIGITS + 1)
+    for positions in range(1, ALL_DIGITS + 1):
+        # Add the lowest position to the mask of the others
+        masks[positions] = masks[positions & (positions - 1)] | 1 << unit[(positions & -positions).bit_length() - 1]
+    return tuple(masks)
+
+
+# UNIT_SUBSET_CELLS[u][positions] are the cells at those positions of unit u.
+UNIT_SUBSET_CELLS = tuple(unit_subset_cells(unit) for unit in UNITS)
+
+# BOX_ROW_MASKS[b][br] are the cells of row br inside box b, ROW_OUTSIDE_BOX_MASKS[b][br] the rest of that row.
+BOX_ROW_MASKS = tuple(tuple(ROW_MASKS[b // 3 * 3 + br] & BOX_MASKS[b] for br in range(3)) for b in range(9))
+ROW_OUTSIDE_BOX_MASKS = tuple(tuple(ROW_MASKS[b // 3 * 3 + br] & ~BOX_MASKS[b] for br in range(3)) for b in range(9))
+BOX_COLUMN_MASKS = tuple(tuple(COLUMN_MASKS[b % 3 * 3 + bc] & BOX_MASKS[b] for bc in range(3)) for b in range(9))
+COLUMN_OUTSIDE_BOX_MASKS = tuple(tuple(COLUMN_MASKS[b % 3 * 3 + bc] & ~BOX_MASKS[b] for bc in range(3)) for b in range(9))
+
+# BOX_OUTSIDE_ROW_MASKS[b][br] are the cells of box b not in its row br, same for columns.
+BOX_OUTSIDE_ROW_MASKS = tuple(tuple(BOX_MASKS[b] & ~ROW_MASKS[b // 3 * 3 + br] for br in range(3)) for b in range(9))
+BOX_OUTSIDE_COLUMN_MASKS = tuple(tuple(BOX_MASKS[b] & ~COLUMN_MASKS[b % 3 * 3 + bc] for bc in range(3)) for b in range(9))
 
 
 def valid_cell_value(n: int) -> bool:
     return n >= 0 and n <= 9
 
 
+def digit_bit(d: int) -> int:
+    return 1 << (d - 1)
+
+
+def iter_digits(mask: int) -> Iterator[int]:
+    while mask:
+        bit = mask & -mask
+        yield bit.bit_length()
+        mask ^= bit
+
+
+@lru_cache(maxsize=None)
+def submasks(mask: int, size: int) -> Tuple[int, ...]:
+    """
+        Every mask made of `size` of the bits set in a 9-bit mask.
+    """
+    bits = [1 << k for k in BIT_POSITIONS[mask]]
+    return tuple(sum(subset) for subset in combinations(bits, size))
+
+
+def find_subsets(masks: Sequence[int], size: int) -> List[Tuple[int, int]]:
+    """
+        Every choice of `size` non-empty 9-bit masks whose union has exactly `size` bits, as (mask of the chosen indices, union).
+        The union is extended one mask at a time and a branch is dropped as soon as it has more than `size` bits.
+    """
+    subsets: List[Tuple[int, int]] = []
+    # Masks with more than `size` bits can never be part of a subset
+    usable = [(1 << k, mask) for k, mask in enumerate(masks) if 0 < POPCOUNT[mask] <= size]
+    if len(usable) < size:
+        return subsets
+    # Partial subsets as (next usable mask, chosen indices, union, number of masks chosen)
+    stack = [(0, 0, 0, 0)]
+    while stack:
+        start, chosen, union, depth = stack.pop()
+        for j in range(start, len(usable)):
+            bit, mask = usable[j]
+            extended = union | mask
+            if POPCOUNT[extended] > size:
+                continue
+            if depth + 1 < size:
+                stack.append((j + 1, chosen | bit, extended, depth + 1))
+            elif POPCOUNT[extended] == size:
+                subsets.append((chosen | bit, extended))
+    return subsets
+
+
 def cell_index(r: int, c: int) -> int:
     return r * 9 + c
 
 
 def position(i: int) -> Tuple[int, int, int]:
-    r = row_of(i)
-    c = column_of(i)
-    b = box_of_rc(r, c)
-    return r, c, b
+    return POSITIONS[i]
 
 
 def box_of_i(i: int) -> int:
-    return box_of_rc(row_of(i), column_of(i))
+    return BOX_OF[i]
 
 
 def column_of(i: int) -> int:
-    return i % 9
+    return COLUMN_OF[i]
 
 
 def row_of(i: int) -> int:
-    return i // 9
+    return ROW_OF[i]
 
 
 def box_of_rc(r: int, c: int) -> int:
-    return r // 3 * 3 + c // 3
+    return BOX_OF[r * 9 + c]
+
 
+def row_indices(r: int) -> Tuple[int, ...]:
+    return ROW_INDICES[r]
 
-def row_indices(r: int) -> List[int]:
-    return [r * 9 + i for i in range(9)]
 
+def column_indices(c: int) -> Tuple[int, ...]:
+    return COLUMN_INDICES[c]
 
-def column_indices(c: int) -> List[int]:
-    return [i * 9 + c for i in range(9)]
 
+def box_indices(b: int) -> Tuple[int, ...]:
+    return BOX_INDICES[b]
 
-def box_indices(b: int) -> List[int]:
-    box_r = b // 3
-    box_c = b % 3
-    c_start = box_c * 3
-    c_end = c_start + 3
-    r_start = box_r * 3
-    r_end = r_start + 3
-    return [cell_index(r, c) for r in range(r_start, r_end) for c in range(c_start, c_end)]
 
+def rows_of_box(b: int) -> Tuple[int, ...]:
+    return BOX_ROWS[b]
 
-def rows_of_box(b: int) -> List[int]:
-    box_start_r = b // 3 * 3
-    return [box_start_r + i for i in range(3)]
 
+def columns_of_box(b: int) -> Tuple[int, ...]:
+    return BOX_COLUMNS[b]
 
-def columns_of_box(b: int) -> List[int]:
-    box_start_c = b % 3 * 3
-    return [box_start_c + i for i in range(3)]
+
+# Byte translation from the characters of a sudoku file to cell values
+DIGIT_VALUES = bytes.maketrans(b"0123456789", bytes(range(10)))
 
 
 def load_cells_from_file(filename: str) -> List[int]:
-    cells = []
-    with open(filename, 'r') as f:
-        lines = f.readlines()
-        if len(lines) != 9:
-            raise ValueError('File must contain exactly 9 lines')
-        for line in lines:
-            line = line.replace(" ", "").strip()
-            if len(line) != 9:
-                raise ValueError('Each line must contain exactly 9 numbers')
-            for c in line:
-                if not c.isdigit():
-                    raise ValueError('Each cell must be a number')
-                cells.append(int(c))
-    return cells
-
-
-def query_indices(r: int = None, c: int = None, b: int = None) -> List[int]:
+    with open(filename, 'rb') as f:
+        data = f.read().translate(None, b" \t\r\n")
+    if data.translate(None, b"0123456789"):
+        raise ValueError('Each cell must be a number')
+    if len(data) != 81:
+        raise ValueError('File must contain exactly 81 numbers')
+    return list(data.translate(DIGIT_VALUES))
+
+
+@lru_cache(maxsize=None)
+def query_indices(r: Optional[int] = None, c: Optional[int] = None, b: Optional[int] = None) -> Tuple[int, ...]:
     if r is None and c is None and b is None:
-        return list(range(81))
+        return tuple(range(81))
     if r is not None and c is not None:
-        return [cell_index(r, c)]
+        return (cell_index(r, c),)
     if r is not None:
         if b is not None:
             r_start = b // 3 * 3
@@ -91,7 +205,7 @@ def query_indices(r: int = None, c: int = None, b: int = None) -> List[int]:
             c_end = c_start + 3
             if c is not None:
                 c += c_start
-                return [cell_index(r, c)]
+                return (cell_index(r, c),)
             return row_indices(r)[c_start:c_end]
         return row_indices(r)
     if c is not None:
@@ -104,3 +218,5 @@ def query_indices(r: int = None, c: int = None, b: int = None) -> List[int]:
         return column_indices(c)
     if b is not None:
         return box_indices(b)
+    # Every combination of r, c and b is handled above
+    raise ValueError('Invalid query')
@@ -3,6 +3,15 @@ from src.sudoku import Sudoku
 
 
 def assert_solved(s: Sudoku):
+    # Techniques only, the exact cover search would hide a technique that stopped working
+    s.solve(fallback=False)
+    assert s.solved
+
+
+def assert_solved_by_fallback(s: Sudoku):
+    techniques_only = Sudoku(list(s.cells))
+    techniques_only.solve(fallback=False)
+    assert not techniques_only.solved
     s.solve()
     assert s.solved
 
@@ -25,7 +34,15 @@ class TestDifficulty:
         assert_solved(sudoku_expert_2())
 
     def test_sudoku_evil(self):
-        assert_solved(sudoku_evil())
+        assert_solved_by_fallback(sudoku_evil())
 
     def test_sudoku_evil_2(self):
-        assert_solved(sudoku_evil_2())
+        assert_solved_by_fallback(sudoku_evil_2())
+
+    def test_solve_many(self):
+        boards = [sudoku_easy(), sudoku_expert(), sudoku_evil()]
+        solutions = Sudoku.solve_many([board.cells for board in boards], workers=2)
+        assert len(solutions) == len(boards)
+        for board, cells in zip(boards, solutions):
+            assert all(v == 0 or v == s for v, s in zip(board.cells, cells))
+            assert Sudoku(cells).solved
@@ -1,7 +1,11 @@
 import pytest
 
+from src.boards.difficulty import sudoku_easy
+from src.exact_cover import solve_exact_cover
 from src.exceptions import InvalidCellValue, InvalidSudoku
-from src.sudoku import Sudoku, position
+from src.sudoku import Sudoku
+from src.util import (PEERS, ROW_INDICES, UNIT_MASKS, UNIT_SUBSET_CELLS,
+                      find_subsets, iter_digits, position, submasks)
 
 
 @pytest.fixture
@@ -28,6 +32,11 @@ class TestSudoku:
         with pytest.raises(InvalidCellValue):
             sudoku.set_cells([-1] * 81)
 
+    def test_slots(self, sudoku: Sudoku):
+        assert not hasattr(sudoku, "__dict__")
+        with pytest.raises(AttributeError):
+            sudoku.solution = None
+
     def test_row(self, sudoku: Sudoku):
         assert sudoku.row(0) == [0, 6, 0, 4, 0, 1, 3, 7, 0]
         assert sudoku.row(8) == [0, 0, 0, 5, 9, 0, 0, 0, 3]
@@ -43,12 +52,141 @@ class TestSudoku:
         assert sudoku.box(4) == [0, 0, 0, 3, 6, 9, 0, 0, 8]
         assert sudoku.box(8) == [2, 0, 0, 0, 0, 0, 0, 0, 3]
 
+    def test_set_cell(self, sudoku: Sudoku):
+        # 6 is already in row 0, rejected without touching the board
+        revision = sudoku.revision
+        assert not sudoku.set_cell(0, 0, 6)
+        assert sudoku.get_cell(0, 0) == 0
+        assert sudoku.revision == revision
+
+        assert sudoku.set_cell(0, 0, 2)
+        assert sudoku.get_cell(0, 0) == 2
+        assert sudoku.candidates[0] == 0
+        assert 2 not in set(iter_digits(sudoku.candidates[2]))
+
+        sudoku.unset_cell(0, 0)
+        assert sudoku.get_cell(0, 0) == 0
+        assert set(iter_digits(sudoku.candidates[0])) == {2, 5, 8, 9}
+        assert 2 in set(iter_digits(sudoku.candidates[2]))
+
+    def test_from_file(self, sudoku: Sudoku, tmp_path):
+        path = tmp_path / "sudoku.txt"
+        path.write_text("\n".join(" ".join(map(str, sudoku.row(r))) for r in range(9)) + "\n")
+        assert Sudoku.from_file(str(path)).cells == sudoku.cells
+
+        path.write_text("12x" * 27)
+        with pytest.raises(ValueError):
+            Sudoku.from_file(str(path))
+        path.write_text("1" * 80)
+        with pytest.raises(ValueError):
+            Sudoku.from_file(str(path))
+
+    def test_unset_cell_after_techniques(self):
+        easy_sudoku = sudoku_easy()
+        cells = list(easy_sudoku.cells)
+        # A wrong digit, then eliminations that rely on it
+        easy_sudoku.set_cell(0, 0, 2)
+        easy_sudoku.eliminate_using_all_techniques()
+        easy_sudoku.unset_cell(0, 0)
+        assert list(easy_sudoku.cells) == cells
+        easy_sudoku.solve()
+        assert easy_sudoku.solved
+
     def test_candidates(self, sudoku: Sudoku):
-        assert sudoku.compute_candidates(0) == {2, 5, 8, 9}
-        assert sudoku.compute_candidates(8) == {5, 8, 9}
+        # Candidates are ready as soon as the cells are set
+        assert set(iter_digits(sudoku.candidates[0])) == {2, 5, 8, 9}
+        assert sudoku.candidates[1] == 0
+
+        assert set(iter_digits(sudoku.compute_candidates(0))) == {2, 5, 8, 9}
+        assert set(iter_digits(sudoku.compute_candidates(8))) == {5, 8, 9}
 
         blank_sudoku = Sudoku()
-        assert blank_sudoku.compute_candidates(0) == {1, 2, 3, 4, 5, 6, 7, 8, 9}
+        assert set(iter_digits(blank_sudoku.compute_candidates(0))) == {1, 2, 3, 4, 5, 6, 7, 8, 9}
+
+    def test_count_candidates(self, sudoku: Sudoku):
+        # Row 0 has candidates {2, 5, 8, 9}, {2, 5, 9}, {5, 8} and {5, 8, 9}
+        assert sudoku.count_candidates(ROW_INDICES[0]) == [0, 0, 2, 0, 0, 4, 0, 0, 3, 3]
+
+    def test_candidate_cells(self, sudoku: Sudoku):
+        def assert_consistent():
+            for d in range(1, 10):
+                cells = [i for i in range(81) if sudoku.candidate_cells[d - 1] >> i & 1]
+                assert cells == [i for i in range(81) if d in iter_digits(sudoku.candidates[i])]
+
+        sudoku.compute_candidates()
+        assert_consistent()
+        sudoku.place_cell(0, 2)
+        assert_consistent()
+        sudoku.hidden_subsets()
+        sudoku.naked_subsets()
+        assert_consistent()
+
+    def test_naked_quad(self):
+        blank_sudoku = Sudoku()
+        # Cells 0 to 3 of row 0 only hold 1, 2, 3 and 4
+        for d in range(5, 10):
+            blank_sudoku.eliminate_candidates_by_mask(0b1111, d)
+        assert blank_sudoku.naked_subsets() > 0
+        assert all(set(iter_digits(blank_sudoku.candidates[i])) == {5, 6, 7, 8, 9} for i in range(4, 9))
+
+    def test_dirty_cells(self, sudoku: Sudoku):
+        sudoku.compute_candidates()
+        assert sudoku.take_dirty_cells("naked_subsets") == (1 << 81) - 1
+        assert sudoku.take_dirty_cells("naked_subsets") == 0
+
+        # Cell 0 and the peers losing candidate 2 are dirty
+        changed = [0] + [i for i in PEERS[0] if 2 in iter_digits(sudoku.candidates[i])]
+        sudoku.place_cell(0, 2)
+        assert sudoku.take_dirty_cells("naked_subsets") == sum(1 << i for i in changed)
+        assert sudoku.take_dirty_cells("hidden_subsets") == (1 << 81) - 1
+
+        # Hidden singles leave nothing to rescan once they reach a fixpoint
+        sudoku.solve_hidden_singles()
+        assert sudoku.take_dirty_cells("hidden_singles") == 0
+
+    def test_idle_techniques(self, sudoku: Sudoku):
+        sudoku.eliminate_using_all_techniques()
+        revision = sudoku.revision
+        # Nothing changed, so every technique is skipped
+        assert sudoku.eliminate_using_all_techniques() == 0
+        assert sudoku.revision == revision
+        assert set(sudoku.idle_techniques.values()) == {revision}
+
+    def test_used(self, sudoku: Sudoku):
+        assert set(iter_digits(sudoku.row_used[0])) == {1, 3, 4, 6, 7}
+        assert set(iter_digits(sudoku.column_used[8])) == {1, 2, 3, 6}
+        assert set(iter_digits(sudoku.box_used[4])) == {3, 6, 8, 9}
+
+        sudoku.place_cell(0, 2)
+        assert set(iter_digits(sudoku.row_used[0])) == {1, 2, 3, 4, 6, 7}
+        assert set(iter_digits(sudoku.column_used[0])) == {1, 2, 3, 4, 6}
+        assert set(iter_digits(sudoku.box_used[0])) == {1, 2, 3, 6}
+
+    def test_solve_by_exact_cover(self):
+        blank_sudoku = Sudoku()
+        blank_sudoku.solve()
+        assert blank_sudoku.solved
+
+        # The techniques alone leave empty cells on this one, only the search can finish it
+        cells = [int(c) for c in "800000000003600000070090200050007000000045700000100030001000068008500010090000400"]
+        techniques_only = Sudoku(cells)
+        techniques_only.solve(fallback=False)
+        assert 0 in techniques_only.cells
+
+        hard_sudoku = Sudoku(cells)
+        hard_sudoku.solve()
+        assert hard_sudoku.solved
+
+    def test_render(self, sudoku: Sudoku):
+        lines = sudoku.render().split("\n")
+        assert len(lines) == 11
+        assert lines[0] == "_ 6 _ | 4 _ 1 | 3 7 _"
+        assert lines[3] == "------+-------+------"
+        assert lines[10] == "_ _ _ | 5 9 _ | _ _ 3"
+
+        candidate_lines = sudoku.render_candidates().split("\n")
+        assert len(candidate_lines) == 11
+        assert candidate_lines[0].split() == ["2589", "259", "|", "58", "|", "589"]
 
     def test_valid(self, sudoku: Sudoku):
         assert sudoku.valid
@@ -94,8 +232,47 @@ class TestSudoku:
         assert not invalid_box_sudoku.valid
 
 
+def test_iter_digits():
+    assert list(iter_digits(0)) == []
+    assert list(iter_digits(0b000000001)) == [1]
+    assert list(iter_digits(0b100010010)) == [2, 5, 9]
+    assert list(iter_digits(0x1FF)) == [1, 2, 3, 4, 5, 6, 7, 8, 9]
+
+
 def test_position():
     assert position(0) == (0, 0, 0)
     assert position(4) == (0, 4, 1)
     assert position(28) == (3, 1, 3)
     assert position(80) == (8, 8, 8)
+
+
+def test_peers():
+    assert all(len(peers) == 20 for peers in PEERS)
+    assert PEERS[0] == (1, 2, 3, 4, 5, 6, 7, 8, 9, 10, 11, 18, 19, 20, 27, 36, 45, 54, 63, 72)
+    assert 40 not in PEERS[40]
+
+
+def test_unit_subset_cells():
+    assert UNIT_SUBSET_CELLS[0][0b11] == 0b11
+    assert UNIT_SUBSET_CELLS[9][0b101] == 1 << 0 | 1 << 18
+    assert UNIT_SUBSET_CELLS[18][0x1FF] == UNIT_MASKS[18]
+
+
+def test_submasks():
+    assert submasks(0b1011, 2) == (0b0011, 0b1001, 0b1010)
+    assert submasks(0b1011, 3) == (0b1011,)
+    assert submasks(0b1, 2) == ()
+    assert len(submasks(0x1FF, 4)) == 126
+
+
+def test_find_subsets():
+    assert find_subsets([0b011, 0b110, 0b011, 0], 2) == [(0b101, 0b011)]
+    assert sorted(find_subsets([0b011, 0b110, 0b101, 0b111], 3)) == [(0b0111, 0b111), (0b1011, 0b111), (0b1101, 0b111), (0b1110, 0b111)]
+    assert find_subsets([0b111, 0b011], 2) == []
+
+
+def test_solve_exact_cover():
+    # Columns may have more rows than a sudoku ever gives them
+    solutions = list(solve_exact_cover({0: set(range(12))}, {r: (0,) for r in range(12)}))
+    assert sorted(solutions) == [[r] for r in range(12)]
+    assert list(solve_exact_cover({0: set(), 1: {0}}, {0: (1,)})) == []
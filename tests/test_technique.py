@@ -3,7 +3,8 @@ from src.sudoku import Sudoku
 
 
 def assert_solved(s: Sudoku):
-    s.solve()
+    # Techniques only, the exact cover search would hide a technique that stopped working
+    s.solve(fallback=False)
     assert s.solved
 
 